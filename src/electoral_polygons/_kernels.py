@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # optional: pip install "electoral-polygons[fast]"
+    numba = None
+
+
+# inferred / SV parity codes shared with match_addresses
+PARITY_NONE, PARITY_EVEN, PARITY_ODD = 0, 1, 2
+
+
+def _spec_mask_numpy(
+    lo: np.ndarray,
+    hi: np.ndarray,
+    parity_inf: np.ndarray,
+    ranges_lo: np.ndarray,
+    ranges_hi: np.ndarray,
+    singles: np.ndarray,
+    parity_code: int,
+) -> np.ndarray:
+    """
+    Row mask for one "numbers" spec over housenumber intervals lo..hi (lo > hi means no number).
+    Covered numbers step by 2 when parity_inf is set. Each filter only needs some covered number:
+
+      - parity_code:          SV parity (PARITY_NONE / PARITY_EVEN / PARITY_ODD)
+      - ranges_lo/ranges_hi:  SV ranges with lo <= hi (empty = no range filter)
+      - singles:              SV single numbers (empty = no singles filter)
+    """
+    step = np.where(parity_inf != PARITY_NONE, 2, 1)
+    ok = lo <= hi
+
+    # IMPORTANT: if the housenumber looks like an even-only or odd-only range,
+    # enforce that before checking SV parity. A step-1 interval wider than one
+    # number covers both parities.
+    lo_odd = (lo & 1).astype(bool)
+    mixed = (step == 1) & (hi > lo)
+    if parity_code == PARITY_ODD:
+        ok &= (parity_inf != PARITY_EVEN) & (lo_odd | mixed)
+    elif parity_code == PARITY_EVEN:
+        ok &= (parity_inf != PARITY_ODD) & (~lo_odd | mixed)
+
+    lo_c, hi_c, step_c = lo[:, None], hi[:, None], step[:, None]
+
+    # range overlap: the first covered number >= the range start must not pass the range end
+    if len(ranges_lo):
+        first = np.maximum(lo_c, ranges_lo[None, :])
+        first += (first - lo_c) % step_c
+        ok &= (first <= np.minimum(hi_c, ranges_hi[None, :])).any(axis=1)
+
+    # singles: some single lies on lo, lo+step, ..., hi
+    if len(singles):
+        x = singles[None, :]
+        ok &= ((x >= lo_c) & (x <= hi_c) & ((x - lo_c) % step_c == 0)).any(axis=1)
+
+    return ok
+
+
+if numba is not None:
+
+    @numba.njit(cache=True, nogil=True)
+    def _row_ok(lo, hi, parity_inf, ranges_lo, ranges_hi, singles, parity_code):
+        if lo > hi:
+            return False
+
+        step = 2 if parity_inf != PARITY_NONE else 1
+        lo_odd = lo % 2 == 1
+        mixed = step == 1 and hi > lo
+        if parity_code == PARITY_ODD:
+            if parity_inf == PARITY_EVEN or not (lo_odd or mixed):
+                return False
+        elif parity_code == PARITY_EVEN:
+            if parity_inf == PARITY_ODD or not (not lo_odd or mixed):
+                return False
+
+        if ranges_lo.shape[0] > 0:
+            hit = False
+            for k in range(ranges_lo.shape[0]):
+                first = max(lo, ranges_lo[k])
+                first += (first - lo) % step
+                if first <= min(hi, ranges_hi[k]):
+                    hit = True
+                    break
+            if not hit:
+                return False
+
+        if singles.shape[0] > 0:
+            hit = False
+            for k in range(singles.shape[0]):
+                x = singles[k]
+                if lo <= x <= hi and (x - lo) % step == 0:
+                    hit = True
+                    break
+            if not hit:
+                return False
+
+        return True
+
+    # nogil instead of parallel=True: match_sv_addresses already runs rules on a thread
+    # pool, and the default workqueue threading layer rejects concurrent parallel launches
+    @numba.njit(cache=True, nogil=True)
+    def _spec_mask_numba(lo, hi, parity_inf, ranges_lo, ranges_hi, singles, parity_code):
+        out = np.zeros(lo.shape[0], dtype=np.bool_)
+        for i in range(lo.shape[0]):
+            out[i] = _row_ok(
+                lo[i], hi[i], parity_inf[i], ranges_lo, ranges_hi, singles, parity_code
+            )
+        return out
+
+    spec_mask = _spec_mask_numba
+else:
+    spec_mask = _spec_mask_numpy
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import geopandas as gpd
+import pyogrio
+
+
+def write_gpkg_layer(
+    gdf: gpd.GeoDataFrame,
+    gpkg_path: str | Path,
+    layer: str,
+    spatial_index: bool = True,
+    **kwargs,
+) -> None:
+    """
+    Write (overwrite) one GPKG layer through pyogrio.
+
+    GDAL already defers the R-tree of a newly written layer and bulk-loads it after the
+    inserts, so the per-row rtree triggers never fire. What is left is SQLite's fsync on
+    every commit: OGR_SQLITE_SYNCHRONOUS=OFF (PRAGMA synchronous=OFF) drops it for the write.
+    Only an OS crash / power loss mid-write can corrupt the file, and these GPKGs are rebuilt
+    from OSM / dev scripts anyway.
+
+    spatial_index=False skips the R-tree entirely (scratch / debug layers nobody queries by bbox).
+    Extra kwargs go to GeoDataFrame.to_file (e.g. use_arrow=True).
+    """
+    prev = pyogrio.get_gdal_config_option("OGR_SQLITE_SYNCHRONOUS")
+    pyogrio.set_gdal_config_options({"OGR_SQLITE_SYNCHRONOUS": "OFF"})
+    try:
+        gdf.to_file(
+            gpkg_path,
+            layer=layer,
+            driver="GPKG",
+            engine="pyogrio",
+            layer_options={"SPATIAL_INDEX": "YES" if spatial_index else "NO"},
+            **kwargs,
+        )
+    finally:
+        pyogrio.set_gdal_config_options({"OGR_SQLITE_SYNCHRONOUS": prev})
+
+
+def layer_bbox(gpkg_path: str | Path, layer: str, area, area_crs) -> tuple[float, float, float, float]:
+    """Bounds of `area` (given in `area_crs`) in the CRS of `layer`, for pyogrio's bbox= filter."""
+    layer_crs = pyogrio.read_info(gpkg_path, layer=layer)["crs"]
+    if not layer_crs:
+        return tuple(area.bounds)
+    return tuple(gpd.GeoSeries([area], crs=area_crs).to_crs(layer_crs).total_bounds)
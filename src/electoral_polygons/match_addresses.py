@@ -1,176 +1,120 @@
 from __future__ import annotations
 
-from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+import functools
 import geopandas as gpd
+import numpy as np
+import os
 import pandas as pd
 import unicodedata
 import re
 
+from electoral_polygons._kernels import PARITY_EVEN, PARITY_NONE, PARITY_ODD, spec_mask
+from electoral_polygons.rules_parser import spec_ints
+
+try:
+    import pyarrow  # noqa: F401
+
+    # contiguous Arrow buffers + Arrow compute kernels for the str accessor
+    _STRING_DTYPE = pd.StringDtype("pyarrow")
+except ImportError:
+    _STRING_DTYPE = pd.StringDtype()
+
+
+# Combining Diacritical Marks block: what NFKD splits off the Romanian (and other Latin) letters
+_COMBINING_TABLE = dict.fromkeys(range(0x0300, 0x0370))
+
+_PAREN_RE = re.compile(r"\s*\(.*?\)")
+_WS_RE = re.compile(r"\s+")
+
 
 def normalize_street(name) -> str:
     if name is None or (isinstance(name, float) and pd.isna(name)):
         return ""
-    name = str(name)
-
-    # remove parenthetical aliases
-    name = re.sub(r"\s*\(.*?\)", "", name)
+    return _normalize_street_cached(str(name))
 
-    name = name.lower()
-    name = unicodedata.normalize("NFKD", name)
-    name = "".join(c for c in name if not unicodedata.combining(c))
-    name = re.sub(r"\s+", " ", name).strip()
-    return name
 
+@functools.lru_cache(maxsize=65536)
+def _normalize_street_cached(name: str) -> str:
+    # remove parenthetical aliases
+    name = _PAREN_RE.sub("", name).lower()
 
-_HN_RANGE_RE = re.compile(r"^\s*(\d+)\s*[-–]\s*(\d+)\s*$")
+    # quick check: pure ASCII has nothing for NFKD to decompose (most OSM names)
+    if not name.isascii():
+        name = unicodedata.normalize("NFKD", name).translate(_COMBINING_TABLE)
+    return _WS_RE.sub(" ", name).strip()
 
 
-def housenumber_info(hn) -> Tuple[set[int], Optional[str], bool]:
+def normalize_street_series(names: pd.Series) -> pd.Series:
     """
-    Returns (covered_numbers_set, inferred_parity, is_range)
+    Column-wise normalize_street using pandas string kernels instead of a per-row apply.
+    Combining marks left by NFKD (the _COMBINING_TABLE range) are dropped in one regex pass.
 
-    inferred_parity:
-      - "odd"  if a-b and both endpoints odd  (treat range as odd-only)
-      - "even" if a-b and both endpoints even (treat range as even-only)
-      - None   otherwise (treat as all numbers)
+    Only distinct names are normalized (OSM splits one street into many same-named rows).
     """
-    if hn is None or (isinstance(hn, float) and pd.isna(hn)):
-        return set(), None, False
-
-    s = str(hn).strip()
-
-    # pure int
-    if re.fullmatch(r"\d+", s):
-        n = int(s)
-        return {n}, None, False
-
-    # range "75-79"
-    m = _HN_RANGE_RE.match(s)
-    if m:
-        a, b = int(m.group(1)), int(m.group(2))
-        lo, hi = (a, b) if a <= b else (b, a)
-
-        inferred_parity: Optional[str] = None
-        if (lo % 2 == 0) and (hi % 2 == 0):
-            inferred_parity = "even"
-            covered = set(range(lo, hi + 1, 2))
-        elif (lo % 2 == 1) and (hi % 2 == 1):
-            inferred_parity = "odd"
-            covered = set(range(lo, hi + 1, 2))
-        else:
-            covered = set(range(lo, hi + 1))
-
-        return covered, inferred_parity, True
-
-    # messy stuff like 109A, 109/1, etc -> keep leading digits
-    m = re.match(r"(\d+)", s)
-    if m:
-        n = int(m.group(1))
-        return {n}, None, False
-
-    return set(), None, False
+    codes, uniques = pd.factorize(names.astype(_STRING_DTYPE))
+    s = pd.Series(uniques, dtype=_STRING_DTYPE)
+    # pattern strings, not the compiled objects: those would push Arrow strings back to Python
+    s = s.str.replace(_PAREN_RE.pattern, "", regex=True).str.lower()
+    s = s.str.normalize("NFKD").str.replace("[\u0300-\u036f]+", "", regex=True)
+    s = s.str.replace(_WS_RE.pattern, " ", regex=True).str.strip()
+    # missing names have code -1, which picks the trailing ""
+    out = np.append(s.to_numpy(dtype=object), "")[codes]
+    return pd.Series(out, index=names.index, dtype=_STRING_DTYPE)
 
-def dedupe_by_address(
-    gdf: gpd.GeoDataFrame,
-    street_col: str = "_street_norm",
-    hn_int_col: str = "addr_housenumber_int",
-    id_col: str = "addr_id",
-) -> gpd.GeoDataFrame:
-    """
-    Keep exactly 1 feature per (street_norm, housenumber_int).
-    Prefer building geometries (ways) over nodes when addr_id is like 'way:...' / 'node:...'.
-    """
 
-    if gdf.empty:
-        return gdf
+# Leading number plus an optional "-b" / "–b" that must end the string
+_HN_EXTRACT_RE = r"^\s*(\d+)(?:\s*[-–]\s*(\d+)\s*$)?"
 
-    # ensure housenumber_int exists; if not, best-effort extract from addr_housenumber
-    if hn_int_col not in gdf.columns:
-        gdf[hn_int_col] = (
-            gdf["addr_housenumber"]
-            .astype(str)
-            .str.extract(r"(\d+)", expand=False)
-        )
-        gdf[hn_int_col] = pd.to_numeric(gdf[hn_int_col], errors="coerce")
-
-    # preference score: 0 = best
-    def pref_score(x: str) -> int:
-        s = "" if x is None else str(x)
-        if s.startswith("way:"):
-            return 0
-        if s.startswith("relation:"):
-            return 1
-        if s.startswith("node:"):
-            return 2
-        return 3
-
-    g = gdf.copy()
-
-    if id_col in g.columns:
-        g["_pref"] = g[id_col].apply(pref_score)
-        g = g.sort_values([street_col, hn_int_col, "_pref", id_col], kind="mergesort")
-    else:
-        g = g.sort_values([street_col, hn_int_col], kind="mergesort")
+_PARITY_CODES = {"even": PARITY_EVEN, "odd": PARITY_ODD}
 
-    # drop duplicates keeping the preferred one
-    g = g.drop_duplicates(subset=[street_col, hn_int_col], keep="first")
 
-    # clean helper col
-    if "_pref" in g.columns:
-        g = g.drop(columns=["_pref"])
+def _digits_to_int64(digits: pd.Series) -> pd.Series:
+    # up to 18 significant digits always fit int64; longer runs are no house number and
+    # become <NA> instead of wrapping around
+    fits = (digits.str.lstrip("0").str.len() <= 18).fillna(False).to_numpy(dtype=bool)
+    return pd.to_numeric(digits.where(fits), errors="coerce").astype("Int64")
 
-    return g
 
-def dedupe_by_address(
-    gdf: gpd.GeoDataFrame,
-    street_col: str = "_street_norm",
-    hn_int_col: str = "addr_housenumber_int",
-    id_col: str = "addr_id",
-) -> gpd.GeoDataFrame:
+def housenumber_info_series(hns: pd.Series) -> pd.DataFrame:
     """
-    Keep exactly 1 feature per (street_norm, housenumber_int).
-    Prefer building geometries (ways) over nodes when addr_id is like 'way:...' / 'node:...'.
+    Parse OSM housenumbers column-wise. Returns a frame aligned with `hns` with columns:
+      - lo, hi:          covered interval (nullable Int64, <NA> when no number was found)
+      - parity_inferred: int8 code PARITY_NONE / PARITY_EVEN / PARITY_ODD
+      - is_range:        bool
+
+    "75-79" is a range (endpoints sorted); messy values like "109A", "109/1" keep their
+    leading digits. The covered numbers are lo..hi, stepping by 2 when the parity is inferred:
+      - PARITY_ODD  if a-b and both endpoints odd  (treat range as odd-only)
+      - PARITY_EVEN if a-b and both endpoints even (treat range as even-only)
+      - PARITY_NONE otherwise (treat as all numbers)
     """
+    ext = hns.astype(_STRING_DTYPE).str.extract(_HN_EXTRACT_RE)
+    a = _digits_to_int64(ext[0])
+    b = _digits_to_int64(ext[1])
+
+    is_range = b.notna().to_numpy()
+    b = b.fillna(a)
+    lo = a.where(a <= b, b)
+    hi = b.where(a <= b, a)
+
+    lo_odd = (lo % 2 == 1).fillna(False).to_numpy(dtype=bool)
+    hi_odd = (hi % 2 == 1).fillna(False).to_numpy(dtype=bool)
+    has_num = lo.notna().to_numpy()
+    parity_inferred = np.select(
+        [is_range & ~lo_odd & ~hi_odd, is_range & lo_odd & hi_odd],
+        [PARITY_EVEN, PARITY_ODD],
+        default=PARITY_NONE,
+    ).astype(np.int8)
+    parity_inferred[~has_num] = PARITY_NONE
+
+    return pd.DataFrame(
+        {"lo": lo, "hi": hi, "parity_inferred": parity_inferred, "is_range": is_range},
+        index=hns.index,
+    )
 
-    if gdf.empty:
-        return gdf
-
-    # ensure housenumber_int exists; if not, best-effort extract from addr_housenumber
-    if hn_int_col not in gdf.columns:
-        gdf[hn_int_col] = (
-            gdf["addr_housenumber"]
-            .astype(str)
-            .str.extract(r"(\d+)", expand=False)
-        )
-        gdf[hn_int_col] = pd.to_numeric(gdf[hn_int_col], errors="coerce")
-
-    # preference score: 0 = best
-    def pref_score(x: str) -> int:
-        s = "" if x is None else str(x)
-        if s.startswith("way:"):
-            return 0
-        if s.startswith("relation:"):
-            return 1
-        if s.startswith("node:"):
-            return 2
-        return 3
-
-    g = gdf.copy()
-
-    if id_col in g.columns:
-        g["_pref"] = g[id_col].apply(pref_score)
-        g = g.sort_values([street_col, hn_int_col, "_pref", id_col], kind="mergesort")
-    else:
-        g = g.sort_values([street_col, hn_int_col], kind="mergesort")
-
-    # drop duplicates keeping the preferred one
-    g = g.drop_duplicates(subset=[street_col, hn_int_col], keep="first")
-
-    # clean helper col
-    if "_pref" in g.columns:
-        g = g.drop(columns=["_pref"])
-
-    return g
 
 def dedupe_by_address(
     gdf: gpd.GeoDataFrame,
@@ -187,41 +131,56 @@ def dedupe_by_address(
         return gdf
 
     # ensure housenumber_int exists; if not, best-effort extract from addr_housenumber
-    if hn_int_col not in gdf.columns:
-        gdf[hn_int_col] = (
-            gdf["addr_housenumber"]
-            .astype(str)
-            .str.extract(r"(\d+)", expand=False)
-        )
-        gdf[hn_int_col] = pd.to_numeric(gdf[hn_int_col], errors="coerce")
-
-    # preference score: 0 = best
-    def pref_score(x: str) -> int:
-        s = "" if x is None else str(x)
-        if s.startswith("way:"):
-            return 0
-        if s.startswith("relation:"):
-            return 1
-        if s.startswith("node:"):
-            return 2
-        return 3
-
-    g = gdf.copy()
-
-    if id_col in g.columns:
-        g["_pref"] = g[id_col].apply(pref_score)
-        g = g.sort_values([street_col, hn_int_col, "_pref", id_col], kind="mergesort")
+    hn_int = None
+    if hn_int_col in gdf.columns:
+        hn_values = gdf[hn_int_col]
     else:
-        g = g.sort_values([street_col, hn_int_col], kind="mergesort")
-
-    # drop duplicates keeping the preferred one
-    g = g.drop_duplicates(subset=[street_col, hn_int_col], keep="first")
+        hn_int = pd.to_numeric(
+            gdf["addr_housenumber"].astype(str).str.extract(r"(\d+)", expand=False),
+            errors="coerce",
+        )
+        hn_values = hn_int
+
+    # Sort keys as integer codes (missing values last, like sort_values); no helper
+    # columns are added, so gdf itself is never copied
+    street_key = _sort_codes(gdf[street_col])
+    hn_key = _sort_codes(hn_values)
+    keys = [street_key, hn_key]
+
+    if id_col in gdf.columns:
+        # preference score: 0 = best (way, relation, node, anything else)
+        ids = gdf[id_col].astype("string")
+        pref = np.select(
+            [
+                ids.str.startswith("way:", na=False).to_numpy(dtype=bool),
+                ids.str.startswith("relation:", na=False).to_numpy(dtype=bool),
+                ids.str.startswith("node:", na=False).to_numpy(dtype=bool),
+            ],
+            [0, 1, 2],
+            default=3,
+        ).astype("int8")
+        keys += [pref, _sort_codes(gdf[id_col])]
+
+    # stable sort; np.lexsort takes the primary key last
+    order = np.lexsort(keys[::-1])
+
+    # drop duplicates keeping the preferred (first sorted) one
+    s_sorted, h_sorted = street_key[order], hn_key[order]
+    keep = np.r_[True, (s_sorted[1:] != s_sorted[:-1]) | (h_sorted[1:] != h_sorted[:-1])]
+    pos = order[keep]
+
+    g = gdf.take(pos)
+    if hn_int is not None:
+        g[hn_int_col] = hn_int.to_numpy()[pos]
+    return g
 
-    # clean helper col
-    if "_pref" in g.columns:
-        g = g.drop(columns=["_pref"])
 
-    return g
+def _sort_codes(values: pd.Series) -> np.ndarray:
+    """
+    Integer codes that sort like `values` (missing values last, all missing equal).
+    """
+    codes, _ = pd.factorize(values, sort=True)
+    return np.where(codes < 0, codes.max() + 1, codes)
 
 
 def match_sv_addresses(
@@ -231,109 +190,129 @@ def match_sv_addresses(
 ) -> gpd.GeoDataFrame:
     gdf = gpd.read_file(addresses_gpkg, layer=layer)
 
-    # Precompute once
-    gdf["_street_norm"] = gdf["addr_street"].apply(normalize_street)
+    rules = sv_parsed.get("rules", [])
+    rule_norms = [normalize_street(rule.get("street")) for rule in rules]
+
+    # Precompute once (Arrow-backed strings when pyarrow is installed)
+    gdf["addr_housenumber"] = gdf["addr_housenumber"].astype(_STRING_DTYPE)
+
+    # One CategoricalDtype over address *and* rule streets: every rule street gets a code
+    # up front and rows are looked up in code space
+    addr_norms = normalize_street_series(gdf["addr_street"])
+    street_cats = pd.Index(sorted(set(addr_norms.unique()) | set(rule_norms)), dtype=_STRING_DTYPE)
+    gdf["_street_norm"] = addr_norms.astype(pd.CategoricalDtype(street_cats))
+    street_index = _StreetIndex.from_codes(gdf["_street_norm"].cat.codes.to_numpy(), street_cats)
+    rule_codes = street_cats.get_indexer(rule_norms)
+
+    hn = housenumber_info_series(gdf["addr_housenumber"])
+    gdf["_hn_lo"] = hn["lo"]
+    gdf["_hn_hi"] = hn["hi"]
+    gdf["_hn_parity_inferred"] = hn["parity_inferred"]
+    gdf["_hn_is_range"] = hn["is_range"]
+
+    # missing housenumbers become the empty interval 0..-1
+    parity_inferred = hn["parity_inferred"].to_numpy()
+    lo = hn["lo"].to_numpy(dtype=np.int64, na_value=0)
+    hi = hn["hi"].to_numpy(dtype=np.int64, na_value=-1)
+
+    # Rules are independent and the kernel runs without the GIL -> match them concurrently
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        futures = [
+            ex.submit(_match_one_rule, rule, code, street_index, lo, hi, parity_inferred)
+            for rule, code in zip(rules, rule_codes)
+        ]
+        idx_lists = [idx for idx in (f.result() for f in futures) if idx is not None]
+
+    # Union of row positions over all rules, then a single slice of gdf
+    all_idx = np.unique(np.concatenate(idx_lists)) if idx_lists else np.array([], dtype=np.int64)
+    out = gdf.take(all_idx)
 
-    hn_infos = gdf["addr_housenumber"].apply(housenumber_info)
-    gdf["_hn_set"] = hn_infos.apply(lambda t: t[0])
-    gdf["_hn_parity_inferred"] = hn_infos.apply(lambda t: t[1])
-    gdf["_hn_is_range"] = hn_infos.apply(lambda t: t[2])
+    # Collapse duplicates: one row per (street, housenumber_int)
+    out = dedupe_by_address(out)
 
-    matched_frames: List[gpd.GeoDataFrame] = []
+    out["sv"] = sv_parsed.get("sv")
+    return out
 
-    for rule in sv_parsed.get("rules", []):
-        street = rule.get("street")
-        specs = rule.get("specs", [])
-        if not street:
-            continue
 
-        street_norm = normalize_street(street)
+@dataclass(frozen=True)
+class _StreetIndex:
+    """
+    Street code -> address row positions, CSR style: the rows of code c are
+    rows[starts[c] : starts[c + 1]], in ascending order.
+    """
+
+    categories: pd.Index
+    rows: np.ndarray
+    starts: np.ndarray
 
-        # 1) strict equality match
-        street_gdf = gdf[gdf["_street_norm"] == street_norm].copy()
+    @classmethod
+    def from_codes(cls, codes: np.ndarray, categories: pd.Index) -> "_StreetIndex":
+        rows = np.argsort(codes, kind="stable")
+        starts = np.searchsorted(codes[rows], np.arange(len(categories) + 1))
+        return cls(categories=categories, rows=rows, starts=starts)
 
-        # 2) fallback: contains match (helps when OSM has extra tokens)
-        if street_gdf.empty and street_norm:
-            street_gdf = gdf[gdf["_street_norm"].str.contains(street_norm, na=False)].copy()
+    def positions(self, code: int) -> np.ndarray:
+        return self.rows[self.starts[code] : self.starts[code + 1]]
 
-        if street_gdf.empty:
-            continue
 
-        for spec in specs:
-            kind = spec.get("kind")
-
-            if kind == "integral":
-                matched_frames.append(street_gdf)
-                continue
-
-            if kind != "numbers":
-                continue
-
-            parity = spec.get("parity")
-            ranges = spec.get("ranges", [])
-            singles = spec.get("singles", [])
-
-            singles_int: set[int] = set()
-            for x in singles:
-                try:
-                    singles_int.add(int(x))
-                except Exception:
-                    pass
-
-            def row_ok(row) -> bool:
-                hn_set: set[int] = row["_hn_set"]
-                if not hn_set:
-                    return False
-
-                # IMPORTANT: if the housenumber looks like an even-only or odd-only range,
-                # enforce that before checking SV parity.
-                inferred = row["_hn_parity_inferred"]
-                if inferred == "even" and parity == "odd":
-                    return False
-                if inferred == "odd" and parity == "even":
-                    return False
-
-                # parity filter (SV parity)
-                if parity == "odd" and not any(n % 2 == 1 for n in hn_set):
-                    return False
-                if parity == "even" and not any(n % 2 == 0 for n in hn_set):
-                    return False
-
-                # range filter (overlap is fine; inferred parity already handled above)
-                if ranges:
-                    ok = False
-                    for start, end in ranges:
-                        try:
-                            s, e = int(start), int(end)
-                        except Exception:
-                            continue
-                        lo, hi = (s, e) if s <= e else (e, s)
-                        if any(lo <= n <= hi for n in hn_set):
-                            ok = True
-                            break
-                    if not ok:
-                        return False
-
-                # singles filter
-                if singles_int and hn_set.isdisjoint(singles_int):
-                    return False
-
-                return True
-
-            nums = street_gdf[street_gdf.apply(row_ok, axis=1)].copy()
-            if not nums.empty:
-                matched_frames.append(nums)
-
-    if not matched_frames:
-        out = gdf.iloc[0:0].copy()
-    else:
-        out = pd.concat(matched_frames, ignore_index=True)
+def _match_one_rule(
+    rule: Dict[str, Any],
+    street_code: int,
+    street_index: _StreetIndex,
+    lo: np.ndarray,
+    hi: np.ndarray,
+    parity_inferred: np.ndarray,
+) -> Optional[np.ndarray]:
+    """
+    Sorted, unique row positions (into the address frame) matched by any spec of one SV rule,
+    or None if nothing matched. street_code is the rule street's code in street_index.
+    """
+    street = rule.get("street")
+    specs = rule.get("specs", [])
+    if not street:
+        return None
 
-    # Collapse duplicates: one row per (street, housenumber_int)
-    out = dedupe_by_address(out)
-    
+    street_cats = street_index.categories
+    street_norm = street_cats[street_code]
 
-       
+    # 1) strict equality match
+    street_pos = street_index.positions(street_code)
 
-    out["sv"] = sv_parsed.get("sv")
-    return out
+    # 2) fallback: contains match (helps when OSM has extra tokens);
+    #    only the distinct street names are scanned
+    if not len(street_pos) and street_norm:
+        hit_codes = np.flatnonzero(street_cats.str.contains(street_norm, na=False))
+        if len(hit_codes):
+            street_pos = np.sort(np.concatenate([street_index.positions(c) for c in hit_codes]))
+
+    if not len(street_pos):
+        return None
+
+    s_lo, s_hi, s_parity_inf = lo[street_pos], hi[street_pos], parity_inferred[street_pos]
+
+    hit = np.zeros(len(street_pos), dtype=bool)
+
+    for spec in specs:
+        kind = spec.get("kind")
+
+        if kind == "integral":
+            return street_pos
+
+        if kind != "numbers":
+            continue
+
+        # integer forms are precomputed by rules_parser.parse_rule_cell (derived if absent)
+        ranges_int, singles_int = spec_ints(spec)
+        ranges_arr = np.array(ranges_int, dtype=np.int64).reshape(-1, 2)
+        ok = spec_mask(
+            s_lo,
+            s_hi,
+            s_parity_inf,
+            ranges_arr.min(axis=1),
+            ranges_arr.max(axis=1),
+            np.array(singles_int, dtype=np.int64),
+            _PARITY_CODES.get(spec.get("parity"), PARITY_NONE),
+        )
+        hit |= ok
+
+    return street_pos[hit] if hit.any() else None
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import numpy as np
+import shapely
+from shapely.geometry import LineString, MultiLineString
+from shapely.ops import linemerge
+
+
+def longest_linestring(geom):
+    if geom is None or geom.is_empty:
+        return None
+    if isinstance(geom, LineString):
+        return geom
+    # MultiLineString / GeometryCollection: lengths of the LineString parts in one call
+    parts = shapely.get_parts(geom)
+    lines = parts[shapely.get_type_id(parts) == shapely.GeometryType.LINESTRING]
+    if not len(lines):
+        return None
+    return lines[int(np.argmax(shapely.length(lines)))]
+
+
+def chained_linestring(geom):
+    """
+    One LineString through all parts of a (multi)line, for substring/line_locate_point.
+
+    Touching parts are merged first; parts that still don't connect are chained in order,
+    which is the path interpolate/project already followed along a MultiLineString.
+    """
+    if geom is None or geom.is_empty:
+        return None
+    merged = linemerge(geom) if isinstance(geom, MultiLineString) else geom
+    if isinstance(merged, LineString):
+        return merged
+    lines = [g for g in getattr(merged, "geoms", []) if isinstance(g, LineString)]
+    if not lines:
+        return None
+    return LineString(shapely.get_coordinates(lines))
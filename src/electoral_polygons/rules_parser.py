@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from pathlib import Path
+import pickle
 import re
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -11,6 +13,10 @@ import pandas as pd
 # Public API
 # -----------------------------
 
+# bump when parse_sv's output changes so stale cached_parse_sv pickles are ignored
+_PARSE_CACHE_VERSION = 1
+
+
 def parse_sv(xlsx_path: str, judet: str = "B", sv: int = 1, sheet_name: int | str = 0) -> Dict[str, Any]:
     """
     Parse one SV block from the RSV XLSX into a structured dict.
@@ -45,8 +51,13 @@ def parse_sv(xlsx_path: str, judet: str = "B", sv: int = 1, sheet_name: int | st
     header_candidates = target[pd.to_numeric(target["Nr SV"], errors="coerce") == float(sv)]
     header_row = header_candidates.iloc[0] if not header_candidates.empty else target.iloc[0]
 
-    # Rule rows: Arteră must be non-empty
-    rules_df = target[target["Arteră"].notna() & (target["Arteră"].astype(str).str.strip() != "")].copy()
+    # Rule rows: Arteră must be non-empty (column-wise, in original order)
+    target = target.sort_values("_row")
+    streets = _safe_str_series(target["Arteră"])
+    has_street = streets.notna().to_numpy()
+    # Some rows are not actually streets (e.g., "Domiciliul pe raza sec. 1 (D)") -> notes
+    is_note = streets.str.lower().str.startswith("domiciliul", na=False).to_numpy(dtype=bool)
+    rule_texts = _safe_str_series(target["Număr imobil / Alfabetic"])
 
     # Build output
     out: Dict[str, Any] = {
@@ -66,30 +77,68 @@ def parse_sv(xlsx_path: str, judet: str = "B", sv: int = 1, sheet_name: int | st
         },
     }
 
-    for _, row in rules_df.sort_values("_row").iterrows():
-        cod_artera = row.get("Cod Arteră")
-        street = _safe_str(row.get("Arteră"))
-        low_street = (street or "").lower()
-        if low_street.startswith("domiciliul"):
-            out.setdefault("notes", []).append({"street": street, "raw": rule_text})
-            continue
+    note_mask = has_street & is_note
+    if note_mask.any():
+        out["notes"] = [
+            {"street": street, "raw": raw}
+            for street, raw in zip(streets[note_mask], rule_texts[note_mask])
+        ]
+
+    rule_mask = has_street & ~is_note
+    rule_streets = streets[rule_mask]
+    rule_raws = rule_texts[rule_mask]
+    rule_specs = rule_raws.map(parse_rule_cell)
+    # not .map(): pandas would turn the int/None results into floats
+    rule_cods = [_safe_int_or_none(x) for x in target.loc[rule_mask, "Cod Arteră"]]
+
+    out["rules"] = [
+        {
+            "cod_artera": cod_artera,
+            "street": street,
+            "specs": specs,
+            "raw": rule_text,
+        }
+        for cod_artera, street, specs, rule_text in zip(rule_cods, rule_streets, rule_specs, rule_raws)
+    ]
 
-        rule_text = _safe_str(row.get("Număr imobil / Alfabetic"))
+    return out
 
-        # Some rows are not actually streets (e.g., "Domiciliul pe raza sec. 1 (D)")
-        # We still keep them, but they will parse as integral or empty specs.
-        specs = parse_rule_cell(rule_text)
 
-        out["rules"].append(
-            {
-                "cod_artera": _safe_int_or_none(cod_artera),
-                "street": street,
-                "specs": specs,
-                "raw": rule_text,
-            }
-        )
+def cached_parse_sv(
+    xlsx_path: str,
+    cache_dir: str | Path,
+    judet: str = "B",
+    sv: int = 1,
+    sheet_name: int | str = 0,
+) -> Dict[str, Any]:
+    """
+    parse_sv, memoized in `cache_dir`/sv{sv}_parsed.pkl.
 
-    return out
+    The pickle is reused only while the XLSX keeps the same path, mtime and size and the
+    call asks for the same judet/sheet; anything else re-parses the workbook and rewrites it.
+    """
+    src = Path(xlsx_path)
+    st = src.stat()
+    key = (_PARSE_CACHE_VERSION, str(src.resolve()), st.st_mtime_ns, st.st_size, str(judet), int(sv), sheet_name)
+
+    cache_path = Path(cache_dir) / f"sv{int(sv)}_parsed.pkl"
+    if cache_path.exists():
+        try:
+            with cache_path.open("rb") as f:
+                cached_key, parsed = pickle.load(f)
+            if cached_key == key:
+                return parsed
+        except Exception:
+            pass  # unreadable / old format -> re-parse
+
+    parsed = parse_sv(xlsx_path=xlsx_path, judet=judet, sv=sv, sheet_name=sheet_name)
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(".pkl.tmp")
+    with tmp_path.open("wb") as f:
+        pickle.dump((key, parsed), f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path.replace(cache_path)
+    return parsed
 
 
 def load_rsv_xlsx(xlsx_path: str, sheet_name: int | str = 0) -> pd.DataFrame:
@@ -132,6 +181,9 @@ _SINGLE_RE = re.compile(
     r"nr\.\s*([0-9]+(?:\s*[A-Za-z])?(?:\s*BIS)?)",
     flags=re.IGNORECASE,
 )
+_HEADER_DASH_RE = re.compile(r"nr\.\s*-\s*$")
+_WS_RE = re.compile(r"\s+")
+_LEADING_INT_RE = re.compile(r"\s*(\d+)")
 
 
 def parse_rule_cell(text: str) -> List[Dict[str, Any]]:
@@ -146,7 +198,11 @@ def parse_rule_cell(text: str) -> List[Dict[str, Any]]:
 
     Output spec examples:
       {"kind":"integral"}
-      {"parity":"odd","ranges":[("75","109")],"singles":[],"raw":"..."}
+      {"parity":"odd","ranges":[("75","109")],"singles":[],"raw":"...",
+       "ranges_int":[(75,109)],"singles_int":[]}
+
+    ranges_int / singles_int hold the leading integers of ranges / singles ("299 BIS" -> 299),
+    parsed once here so matching works on ints only.
     """
     t = (text or "").strip()
     if not t:
@@ -161,7 +217,7 @@ def parse_rule_cell(text: str) -> List[Dict[str, Any]]:
         low = p.lower()
 
         # Ignore the typical header cell "nr. -"
-        if "nr." in low and "-" in low and re.search(r"nr\.\s*-\s*$", low):
+        if "nr." in low and "-" in low and _HEADER_DASH_RE.search(low):
             continue
         if low in {"nr. -", "nr.-"}:
             continue
@@ -189,6 +245,7 @@ def parse_rule_cell(text: str) -> List[Dict[str, Any]]:
             "singles": singles,          # list of strings
             "raw": p,
         }
+        spec["ranges_int"], spec["singles_int"] = _token_ints(ranges, singles)
 
         # If it contained neither range nor single, keep raw so we can debug later
         # (some lines can be special notes)
@@ -200,6 +257,22 @@ def parse_rule_cell(text: str) -> List[Dict[str, Any]]:
     return specs
 
 
+def spec_ints(spec: Dict[str, Any]) -> Tuple[List[Tuple[int, int]], List[int]]:
+    """
+    (ranges_int, singles_int) of a "numbers" spec.
+
+    parse_rule_cell stores both; specs without them (JSON dumps from before they existed,
+    hand-built dicts) get them derived from "ranges" / "singles" the same way.
+    Tokens without a leading number ("BIS") are skipped.
+    """
+    ranges_int, singles_int = spec.get("ranges_int"), spec.get("singles_int")
+    if ranges_int is None or singles_int is None:
+        derived = _token_ints(spec.get("ranges", []), spec.get("singles", []))
+        ranges_int = derived[0] if ranges_int is None else ranges_int
+        singles_int = derived[1] if singles_int is None else singles_int
+    return ranges_int, singles_int
+
+
 def _subtract_range_endpoints(singles: List[str], ranges: List[Tuple[str, str]]) -> List[str]:
     """
     Remove occurrences of range endpoints from the singles list if they appear.
@@ -221,8 +294,24 @@ def _subtract_range_endpoints(singles: List[str], ranges: List[Tuple[str, str]])
     return out
 
 
+def _token_ints(ranges, singles) -> Tuple[List[Tuple[int, int]], List[int]]:
+    # a range is kept only if both endpoints have a number
+    ranges_int = [
+        (a, b)
+        for a, b in ((_leading_int(x), _leading_int(y)) for x, y in ranges)
+        if a is not None and b is not None
+    ]
+    singles_int = [n for n in map(_leading_int, singles) if n is not None]
+    return ranges_int, singles_int
+
+
+def _leading_int(s: Any) -> Optional[int]:
+    m = _LEADING_INT_RE.match(str(s))
+    return int(m.group(1)) if m else None
+
+
 def _norm_num_token(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip().upper())
+    return _WS_RE.sub(" ", (s or "").strip().upper())
 
 
 # -----------------------------
@@ -238,6 +327,15 @@ def _safe_str(x: Any) -> Optional[str]:
     return s if s else None
 
 
+def _safe_str_series(s: pd.Series) -> pd.Series:
+    """
+    Column-wise _safe_str: stripped strings, None where missing or blank (object dtype).
+    """
+    t = s.astype("string").str.strip()
+    keep = (t.notna() & (t != "")).to_numpy(dtype=bool)
+    return t.astype(object).where(keep, None)
+
+
 def _safe_int_or_none(x: Any) -> Optional[int]:
     if x is None:
         return None
@@ -19,6 +19,8 @@ except ImportError as e:
         "(or add it to your project dependencies)."
     ) from e
 
+from electoral_polygons.export import write_gpkg_layer
+
 
 # ----------------------------
 # Config
@@ -86,8 +88,8 @@ def _ensure_single_polygon(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
 
 
 def _write_layer(gpkg_path: Path, gdf: gpd.GeoDataFrame, layer: str) -> None:
-    # overwrite layer if exists
-    gdf.to_file(gpkg_path, layer=layer, driver="GPKG")
+    # overwrite layer if exists; pyogrio writes features in bulk instead of fiona's per-feature loop
+    write_gpkg_layer(gdf, gpkg_path, layer)
 
 
 # ----------------------------
@@ -198,25 +200,36 @@ def build_addresses(boundary: gpd.GeoDataFrame, cfg: BuildConfig) -> gpd.GeoData
 
     # Derive source
     # osmnx features_from_polygon returns an index with (element_type, osmid)
-    source = []
-    addr_id = []
-    for idx in addr.index:
-        # idx often like ('node', 123) or ('way', 456)
-        if isinstance(idx, tuple) and len(idx) == 2:
-            etype, oid = idx
-            if etype == "node":
-                source.append("node")
-            elif etype in ("way", "relation"):
-                source.append("building")  # not always building, but usually polygon
+    if isinstance(addr.index, pd.MultiIndex) and addr.index.nlevels == 2:
+        etype = addr.index.get_level_values(0).astype(str)
+        oid = addr.index.get_level_values(1).astype(str)
+        addr["addr_id"] = (etype + ":" + oid).to_numpy()
+        # ways/relations: not always building, but usually polygon
+        addr["source"] = (
+            etype.map({"node": "node", "way": "building", "relation": "building"})
+            .fillna("other")
+            .to_numpy()
+        )
+    else:
+        source = []
+        addr_id = []
+        for idx in addr.index:
+            # idx often like ('node', 123) or ('way', 456)
+            if isinstance(idx, tuple) and len(idx) == 2:
+                etype, oid = idx
+                if etype == "node":
+                    source.append("node")
+                elif etype in ("way", "relation"):
+                    source.append("building")
+                else:
+                    source.append("other")
+                addr_id.append(f"{etype}:{oid}")
             else:
                 source.append("other")
-            addr_id.append(f"{etype}:{oid}")
-        else:
-            source.append("other")
-            addr_id.append(str(idx))
+                addr_id.append(str(idx))
 
-    addr["addr_id"] = addr_id
-    addr["source"] = source
+        addr["addr_id"] = addr_id
+        addr["source"] = source
     addr["addr_street"] = addr.get("addr:street", None)
     addr["addr_housenumber"] = addr["addr:housenumber"].astype(str)
     addr["addr_housenumber_int"] = addr["addr_housenumber"].apply(_parse_housenumber_int)
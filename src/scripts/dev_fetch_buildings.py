@@ -1,33 +1,76 @@
 from __future__ import annotations
 
 from pathlib import Path
-import geopandas as gpd
+import sqlite3
 import osmnx as ox
 import pyogrio
 import pandas as pd
 
+from electoral_polygons.export import write_gpkg_layer
+
+try:
+    import pyarrow  # noqa: F401
+
+    # bulk write through GDAL's Arrow writer instead of per-feature OGR inserts
+    _USE_ARROW = True
+except ImportError:
+    _USE_ARROW = False
+
+
+_POLYGON_TYPES = {"polygon", "multipolygon"}
+
+# One query over the GPKG metadata tables (the file is plain SQLite): feature layers in
+# creation order with geometry type and SRS, without opening the dataset through OGR
+_LAYERS_SQL = """
+SELECT c.table_name, g.geometry_type_name, g.srs_id, s.organization, s.organization_coordsys_id, s.definition
+FROM gpkg_contents c
+JOIN gpkg_geometry_columns g ON g.table_name = c.table_name
+LEFT JOIN gpkg_spatial_ref_sys s ON s.srs_id = g.srs_id
+WHERE c.data_type = 'features'
+ORDER BY c.rowid
+"""
+
+
+def list_feature_layers(gpkg_path: Path) -> list[tuple[str, str, str | None]]:
+    """(name, geometry_type, crs) per feature layer; crs is "EPSG:n", else WKT, else None."""
+    con = sqlite3.connect(f"file:{gpkg_path}?mode=ro", uri=True)
+    try:
+        rows = con.execute(_LAYERS_SQL).fetchall()
+    finally:
+        con.close()
+
+    layers = []
+    for name, gtype, srs_id, org, org_id, definition in rows:
+        # srs_id -1 / 0: the spec's undefined Cartesian / geographic systems;
+        # GDAL:99999 is what GDAL registers for a layer written without a CRS
+        if srs_id is None or srs_id <= 0 or (str(org).upper() == "GDAL" and org_id == 99999):
+            crs = None
+        elif org and org.upper() == "EPSG" and org_id is not None:
+            crs = f"EPSG:{org_id}"
+        else:
+            crs = definition or None
+        layers.append((name, gtype, crs))
+    return layers
+
 
 def pick_boundary_layer(gpkg_path: Path) -> str:
-    layers = pyogrio.list_layers(str(gpkg_path))  # list of (name, geometry_type)
-    for name, gtype in layers:
-        if "boundary" in name.lower() and gtype.lower() in {"polygon", "multipolygon"}:
-            return name
-    for name, gtype in layers:
-        if gtype.lower() in {"polygon", "multipolygon"}:
+    layers = list_feature_layers(gpkg_path)
+    polygon_layers = [name for name, gtype, _ in layers if str(gtype).lower() in _POLYGON_TYPES]
+    for name in polygon_layers:
+        if "boundary" in name.lower():
             return name
-    raise ValueError(f"No polygon boundary-like layer found in {gpkg_path}. Layers: {layers}")
+    if polygon_layers:
+        return polygon_layers[0]
+    raise ValueError(f"No polygon boundary-like layer found in {gpkg_path}. Layers: {[(n, g) for n, g, _ in layers]}")
 
 
 def pick_reference_crs(gpkg_path: Path) -> str:
-    layers = [n for n, _ in pyogrio.list_layers(str(gpkg_path))]
+    crs_by_layer = {name: crs for name, _, crs in list_feature_layers(gpkg_path)}
     for candidate in ["main_streets", "streets", "main_roads", "roads"]:
-        if candidate in layers:
-            g = gpd.read_file(gpkg_path, layer=candidate)
-            if g.crs:
-                return g.crs.to_string()
+        if crs_by_layer.get(candidate):
+            return crs_by_layer[candidate]
     bname = pick_boundary_layer(gpkg_path)
-    b = gpd.read_file(gpkg_path, layer=bname)
-    return b.crs.to_string() if b.crs else "EPSG:4326"
+    return crs_by_layer.get(bname) or "EPSG:4326"
 
 
 def main() -> None:
@@ -40,7 +83,7 @@ def main() -> None:
     boundary_layer = pick_boundary_layer(gpkg_path)
     print(f"Using boundary layer: {boundary_layer}")
 
-    boundary = gpd.read_file(gpkg_path, layer=boundary_layer)
+    boundary = pyogrio.read_dataframe(gpkg_path, layer=boundary_layer, columns=[])
     if boundary.empty:
         raise ValueError(f"Boundary layer '{boundary_layer}' is empty.")
 
@@ -72,8 +115,7 @@ def main() -> None:
     target_crs = pick_reference_crs(gpkg_path)
     gdf = gdf.set_crs(4326).to_crs(target_crs)
 
-    gdf.to_file(gpkg_path, layer=out_layer, driver="GPKG")
-    gdf.to_file(gpkg_path, layer=out_layer, driver="GPKG")
+    write_gpkg_layer(gdf, gpkg_path, out_layer, use_arrow=_USE_ARROW)
 
     print(f"Fetched buildings: {len(gdf)}")
     print(f"Wrote layer '{out_layer}' to: {gpkg_path}")
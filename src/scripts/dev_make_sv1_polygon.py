@@ -1,49 +1,28 @@
 from __future__ import annotations
 
 from pathlib import Path
-import re
-import unicodedata
 
 import geopandas as gpd
-import pandas as pd
-from shapely.geometry import LineString, MultiLineString
+import numpy as np
+import pyogrio
+import shapely
+from pyproj import CRS
+from shapely.geometry import MultiPoint, box
 from shapely.ops import unary_union
 
+from electoral_polygons.export import layer_bbox, write_gpkg_layer
+from electoral_polygons.match_addresses import normalize_street, normalize_street_series
+from electoral_polygons.polygonize import longest_linestring
 
-def normalize_street(name) -> str:
-    if name is None or (isinstance(name, float) and pd.isna(name)):
-        return ""
-    name = str(name)
-    name = re.sub(r"\s*\(.*?\)", "", name)
-    name = name.lower()
-    name = unicodedata.normalize("NFKD", name)
-    name = "".join(c for c in name if not unicodedata.combining(c))
-    name = re.sub(r"\s+", " ", name).strip()
-    return name
-
-
-def longest_linestring(geom):
-    if geom is None or geom.is_empty:
-        return None
-    if isinstance(geom, LineString):
-        return geom
-    if isinstance(geom, MultiLineString):
-        parts = list(geom.geoms)
-        return max(parts, key=lambda g: g.length) if parts else None
-    if hasattr(geom, "geoms"):
-        lines = [g for g in geom.geoms if isinstance(g, LineString)]
-        if lines:
-            return max(lines, key=lambda g: g.length)
-    return None
-
-
-def pick_street_name_field(streets: gpd.GeoDataFrame) -> str:
+
+def pick_street_name_field(columns: list[str]) -> str:
+    available = set(columns)
     # Try common fields
     for cand in ["name", "addr_street", "street", "str_name", "road_name"]:
-        if cand in streets.columns:
+        if cand in available:
             return cand
     # If nothing obvious, show columns
-    raise ValueError(f"Could not find a street-name column. Available columns: {list(streets.columns)}")
+    raise ValueError(f"Could not find a street-name column. Available columns: {columns}")
 
 
 def main() -> None:
@@ -59,36 +38,61 @@ def main() -> None:
     out_gpkg = Path("src/data/scratch/sv1_polygon.gpkg")
     out_layer = "sv1_polygon"
 
-    # --- Load layers ---
-    buildings = gpd.read_file(assets_gpkg, layer=buildings_layer)
-    streets = gpd.read_file(assets_gpkg, layer=streets_layer)
-    boundary = gpd.read_file(assets_gpkg, layer=boundary_layer)
-    pts = gpd.read_file(sv1_points_gpkg, layer=sv1_points_layer)
+    near_pad_m = 1000.0  # read window around the SV points
+
+    # --- Load layers (only the columns used below; columns=[] reads geometry only) ---
+    street_info = pyogrio.read_info(assets_gpkg, layer=streets_layer)
+    name_field = pick_street_name_field(street_info["fields"].tolist())
 
+    pts = pyogrio.read_dataframe(sv1_points_gpkg, layer=sv1_points_layer, columns=[])
     if pts.empty:
         raise ValueError("SV1 points layer is empty. Run dev_match_sv1.py first.")
-    if buildings.empty:
-        raise ValueError("Buildings layer is empty (unexpected).")
-    if streets.empty:
-        raise ValueError("Streets layer is empty (unexpected).")
 
     # --- Choose a metric CRS for buffering ---
     # If your assets are already projected, we’ll keep them; if not, we use EPSG:3857
+    streets_crs = CRS.from_user_input(street_info["crs"]) if street_info["crs"] else None
     work_crs = None
-    if streets.crs is not None and hasattr(streets.crs, "is_geographic") and not streets.crs.is_geographic:
-        work_crs = streets.crs
+    if streets_crs is not None and not streets_crs.is_geographic:
+        work_crs = streets_crs
     else:
         work_crs = "EPSG:3857"
 
+    pts_w = pts.to_crs(work_crs)
+
+    # Only read features near the SV points: GDAL answers bbox= from the GPKG R-tree and
+    # where= in SQLite, so the rest of the city never reaches Python
+    near = box(*pts_w.total_bounds).buffer(near_pad_m)
+    buildings = pyogrio.read_dataframe(
+        assets_gpkg, layer=buildings_layer, columns=[],
+        bbox=layer_bbox(assets_gpkg, buildings_layer, near, work_crs),
+    )
+    streets = pyogrio.read_dataframe(
+        assets_gpkg, layer=streets_layer, columns=[name_field],
+        bbox=layer_bbox(assets_gpkg, streets_layer, near, work_crs),
+        where=f"\"{name_field}\" LIKE '%mihalache%'",
+    )
+    boundary = pyogrio.read_dataframe(assets_gpkg, layer=boundary_layer, columns=[])
+
+    if buildings.empty:
+        raise ValueError("No buildings near the SV1 points (unexpected).")
+    if streets.empty:
+        raise ValueError("No Ion Mihalache streets near the SV1 points.")
+
     # Reproject everything to work CRS
     streets_w = streets.to_crs(work_crs)
     buildings_w = buildings.to_crs(work_crs)
     boundary_w = boundary.to_crs(work_crs)
-    pts_w = pts.to_crs(work_crs)
+
+    # Unions reused below, computed once (a single boundary polygon needs no union)
+    if len(boundary_w) == 1:
+        bnd = boundary_w.geometry.iloc[0]
+    else:
+        bnd = shapely.unary_union(boundary_w.geometry.to_numpy())
+    # only buffered below, so the plain MultiPoint does; no GEOS union needed
+    pts_union = MultiPoint(shapely.get_coordinates(pts_w.geometry.to_numpy()))
 
     # --- Find Ion Mihalache street geometry ---
-    name_field = pick_street_name_field(streets_w)
-    streets_w["_norm"] = streets_w[name_field].apply(normalize_street)
+    streets_w["_norm"] = normalize_street_series(streets_w[name_field])
 
     target_norm = normalize_street("Bulevardul Ion Mihalache")
     mih = streets_w[streets_w["_norm"] == target_norm].copy()
@@ -99,14 +103,12 @@ def main() -> None:
         sample = streets_w[name_field].dropna().astype(str).head(20).tolist()
         raise ValueError(f"Could not find Ion Mihalache in streets layer. Sample names: {sample}")
 
-    mih_line = unary_union(mih.geometry)
-    mih_line = longest_linestring(mih_line)
+    # merge the street's junction-split segments, then keep the longest merged line
+    mih_line = longest_linestring(shapely.line_merge(shapely.unary_union(mih.geometry.to_numpy())))
     if mih_line is None:
         raise ValueError("Failed to build a usable LineString for Ion Mihalache.")
 
     # --- Get the relevant segment using a corridor around points ---
-    pts_union = unary_union(pts_w.geometry)
-
     # 250m corridor around points to cut only the relevant street segment
     seg_geom = mih_line.intersection(pts_union.buffer(250))
     seg = longest_linestring(seg_geom)
@@ -128,12 +130,15 @@ def main() -> None:
         side_polys = list(getattr(sides, "geoms", []))
         if not side_polys:
             raise ValueError("Could not split corridor into sides.")
-        counts = [int(pts_w.within(poly).sum()) for poly in side_polys]
-        chosen_side = side_polys[int(pd.Series(counts).idxmax())]
+        # poly contains pt <=> pt within poly; the tree only exact-tests points inside poly's MBR
+        counts = [len(pts_w.sindex.query(poly, predicate="contains")) for poly in side_polys]
+        chosen_side = side_polys[int(np.argmax(counts))]
         print(f"[debug] side point counts={counts}")
 
     # --- Select buildings intersecting chosen corridor ---
-    b_sel = buildings_w[buildings_w.intersects(chosen_side)].copy()
+    # STRtree MBR prefilter, exact intersects only on the candidates (sorted to keep layer order)
+    b_idx = np.sort(buildings_w.sindex.query(chosen_side, predicate="intersects"))
+    b_sel = buildings_w.iloc[b_idx].copy()
     print(f"[debug] buildings intersect chosen_side = {len(b_sel)}")
 
     print(f"[debug] buildings selected (corridor only) = {len(b_sel)}")
@@ -148,7 +153,7 @@ def main() -> None:
 
     # --- Dissolve buildings into polygon and clip to boundary ---
     poly = unary_union(b_sel.geometry)
-    poly = poly.intersection(unary_union(boundary_w.geometry))
+    poly = poly.intersection(bnd)
 
     out = gpd.GeoDataFrame(
         [{"sv": 1, "street": "Bulevardul Ion Mihalache"}],
@@ -158,7 +163,7 @@ def main() -> None:
 
     # Write in same CRS as work_crs; ArcMap will still load it fine.
     out_gpkg.parent.mkdir(parents=True, exist_ok=True)
-    out.to_file(out_gpkg, layer=out_layer, driver="GPKG")
+    write_gpkg_layer(out, out_gpkg, out_layer)
 
     print(f"Selected buildings: {len(b_sel)}")
     print(f"Wrote SV1 polygon to: {out_gpkg} (layer={out_layer})")
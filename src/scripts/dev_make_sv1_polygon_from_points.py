@@ -1,18 +1,20 @@
 from __future__ import annotations
 
 from pathlib import Path
+import os
 
 import geopandas as gpd
-import pandas as pd
-from shapely.geometry import LineString
-from shapely.ops import unary_union
+import numpy as np
+import pyogrio
+import shapely
+from shapely.geometry import MultiPoint, box
+from shapely.ops import substring, unary_union
 
+from electoral_polygons.export import layer_bbox, write_gpkg_layer
+from electoral_polygons.polygonize import chained_linestring
 
-def _empty_gdf(work_crs: str, cols: list[str]) -> gpd.GeoDataFrame:
-    """Create an empty GeoDataFrame with a geometry column."""
-    base = {c: [] for c in cols}
-    gdf = gpd.GeoDataFrame(base, geometry=gpd.GeoSeries([], crs=work_crs), crs=work_crs)
-    return gdf
+
+DEBUG = bool(os.environ.get("EP_DEBUG"))
 
 
 def main() -> None:
@@ -27,41 +29,61 @@ def main() -> None:
     out_gpkg = assets_gpkg
     out_layer = "sv1_polygon_v3"  # new name to avoid ArcMap caching
 
-    # ---- Load ----
-    buildings = gpd.read_file(assets_gpkg, layer=buildings_layer)
-    boundary = gpd.read_file(assets_gpkg, layer=boundary_layer)
-    streets = gpd.read_file(assets_gpkg, layer=streets_layer)
-    pts = gpd.read_file(sv1_points_gpkg, layer=sv1_points_layer)
+    near_pad_m = 1000.0  # read window around the SV points
+
+    # ---- Load (only the columns used below; columns=[] reads geometry only) ----
+    street_fields = pyogrio.read_info(assets_gpkg, layer=streets_layer)["fields"].tolist()
+    name_field = None
+    for cand in ["name", "addr_street", "street"]:
+        if cand in street_fields:
+            name_field = cand
+            break
+    if name_field is None:
+        raise ValueError(f"Streets layer has no name field. Columns: {street_fields}")
 
+    pts = pyogrio.read_dataframe(sv1_points_gpkg, layer=sv1_points_layer, columns=[])
     if pts.empty:
         raise ValueError("SV1 points empty. Run dev_match_sv1.py first.")
+
+    # Work CRS for metric distances
+    work_crs = "EPSG:3857"
+
+    # Only read features near the SV points: GDAL answers bbox= from the GPKG R-tree and
+    # where= in SQLite, so the rest of the city never reaches Python
+    near = box(*pts.to_crs(work_crs).total_bounds).buffer(near_pad_m)
+    buildings = pyogrio.read_dataframe(
+        assets_gpkg, layer=buildings_layer, columns=[],
+        bbox=layer_bbox(assets_gpkg, buildings_layer, near, work_crs),
+    )
+    boundary = pyogrio.read_dataframe(assets_gpkg, layer=boundary_layer, columns=[])
+    streets = pyogrio.read_dataframe(
+        assets_gpkg, layer=streets_layer, columns=[name_field],
+        bbox=layer_bbox(assets_gpkg, streets_layer, near, work_crs),
+        where=f"\"{name_field}\" LIKE '%mihalache%'",
+    )
+
     if buildings.empty:
-        raise ValueError("Buildings layer empty (unexpected).")
+        raise ValueError("No buildings near the SV1 points (unexpected).")
     if boundary.empty:
         raise ValueError("Boundary layer empty (unexpected).")
     if streets.empty:
-        raise ValueError("Streets layer empty (unexpected).")
+        raise ValueError("No Ion Mihalache streets near the SV1 points.")
 
-    # Work CRS for metric distances
-    work_crs = "EPSG:3857"
-    buildings_w = buildings.to_crs(work_crs)
     boundary_w = boundary.to_crs(work_crs)
     streets_w = streets.to_crs(work_crs)
 
     pts_w = pts.to_crs(work_crs).copy()
     pts_w["pt_id"] = range(len(pts_w))
 
-    pts_union = unary_union(pts_w.geometry)
+    # Unions reused below, computed once (a single boundary polygon needs no union)
+    if len(boundary_w) == 1:
+        bnd = boundary_w.geometry.iloc[0]
+    else:
+        bnd = shapely.unary_union(boundary_w.geometry.to_numpy())
+    # the union of points is just their MultiPoint: build it directly, no GEOS union pass
+    pts_union = MultiPoint(shapely.get_coordinates(pts_w.geometry.to_numpy()))
 
     # ---- Find Ion Mihalache line locally ----
-    name_field = None
-    for cand in ["name", "addr_street", "street"]:
-        if cand in streets_w.columns:
-            name_field = cand
-            break
-    if name_field is None:
-        raise ValueError(f"Streets layer has no name field. Columns: {list(streets_w.columns)}")
-
     streets_w["_norm"] = streets_w[name_field].fillna("").astype(str).str.strip().str.lower()
     target = "bulevardul ion mihalache"
 
@@ -73,94 +95,101 @@ def main() -> None:
 
     # Keep only local segments near SV points (prevents snapping to a far Mihalache piece)
     local = pts_union.buffer(500.0)
-    mih_local = mih[mih.intersects(local)].copy()
+    mih_local = mih.iloc[shapely.intersects(mih.geometry.to_numpy(), local)].copy()
     if mih_local.empty:
         raise ValueError("Found Ion Mihalache, but none of its segments intersect SV1 neighborhood.")
-    mih_line = unary_union(mih_local.geometry)
+    # substring needs a single LineString (OSM splits streets at every junction)
+    mih_line = chained_linestring(unary_union(mih_local.geometry))
+    if mih_line is None:
+        raise ValueError("Failed to build a usable LineString for Ion Mihalache.")
 
     # ---- Build street segment spanning SV points ----
-    dists = [mih_line.project(p) for p in pts_w.geometry]
-    a, b = min(dists), max(dists)
+    dists = shapely.line_locate_point(mih_line, pts_w.geometry.to_numpy())
+    a, b = float(dists.min()), float(dists.max())
 
     pad_along = 10.0
     a = max(0.0, a - pad_along)
     b = min(mih_line.length, b + pad_along)
 
-    n = 300
-    ds = [a + (b - a) * i / (n - 1) for i in range(n)]
-    seg = LineString([mih_line.interpolate(d).coords[0] for d in ds])
+    # the [a, b] stretch of the street itself, cut in one call (keeps the street's own vertices)
+    seg = substring(mih_line, a, b)
 
     # ---- Corridor around segment ----
     frontage_dist = 35.0
     corridor = seg.buffer(frontage_dist)
+    max_seed_dist = 350.0
 
-    cand = buildings_w[buildings_w.intersects(corridor)].copy()
+    # Reproject only the buildings the corridor or the seed search (within max_seed_dist
+    # of a point) can reach: query the source-CRS tree with that box, transform the hits
+    reach = box(*shapely.unary_union([corridor, pts_union.buffer(max_seed_dist)]).bounds)
+    # segmentize so the box edges stay straight-enough after reprojection
+    reach_src = gpd.GeoSeries([shapely.segmentize(reach, 50.0)], crs=work_crs).to_crs(buildings.crs).iloc[0]
+    reach_idx = np.sort(buildings.sindex.query(reach_src, predicate="intersects"))
+    buildings_w = buildings.iloc[reach_idx].to_crs(work_crs)
+
+    # STRtree MBR prefilter, exact intersects only on the candidates (sorted to keep layer order)
+    cand = buildings_w.iloc[np.sort(buildings_w.sindex.query(corridor, predicate="intersects"))].copy()
     print(f"[debug] candidate buildings in corridor: {len(cand)}")
     if cand.empty:
         raise ValueError("No buildings in corridor. Increase frontage_dist (e.g., 90–140).")
 
     # ---- Seed buildings: nearest building to each point (then require corridor intersection) ----
-    all_sidx = buildings_w.sindex
-    max_seed_dist = 350.0
-
-    seed_rows = []
-    failed_rows = []
-
-    for _, r in pts_w.iterrows():
-        p = r.geometry
-        pid = int(r["pt_id"])
-
-        hits = list(all_sidx.intersection(p.buffer(max_seed_dist).bounds))
-        if not hits:
-            failed_rows.append({"pt_id": pid, "reason": "no_hits_in_bbox", "geometry": p})
-            continue
-
-        sub = buildings_w.iloc[hits].copy()
-        sub["d"] = sub.geometry.distance(p)
-        sub = sub[sub["d"] <= max_seed_dist]
-        if sub.empty:
-            failed_rows.append({"pt_id": pid, "reason": "no_building_within_max_seed_dist", "geometry": p})
-            continue
-
-        best_i = sub["d"].idxmin()
-        best_geom = buildings_w.loc[best_i].geometry
-        best_d = float(sub.loc[best_i, "d"])
-
-        # Require it to intersect corridor (avoid snapping behind blocks)
-        if not best_geom.intersects(corridor):
-            failed_rows.append({"pt_id": pid, "reason": f"nearest_not_in_corridor (d={best_d:.1f}m)", "geometry": p})
-            continue
-
-        seed_rows.append({"pt_id": pid, "best_d": best_d, "geometry": best_geom})
-
-    # --- SAFE construction of GeoDataFrames (works even if list is empty) ---
-    if seed_rows:
-        seeds = gpd.GeoDataFrame(seed_rows, geometry="geometry", crs=work_crs)
-    else:
-        seeds = _empty_gdf(work_crs, cols=["pt_id", "best_d"])
-
-    if failed_rows:
-        failed = gpd.GeoDataFrame(failed_rows, geometry="geometry", crs=work_crs)
-    else:
-        failed = _empty_gdf(work_crs, cols=["pt_id", "reason"])
+    # One nearest-neighbour sweep over all points on the sindex already built for the corridor query
+    # (points beyond max_seed_dist get no hit)
+    bgeoms = buildings_w.geometry.to_numpy()
+    (pt_pos, b_pos), hit_d = buildings_w.sindex.nearest(
+        pts_w.geometry.to_numpy(),
+        max_distance=max_seed_dist,
+        return_distance=True,
+        return_all=False,
+    )
+    has_seed = np.zeros(len(pts_w), dtype=bool)
+    has_seed[pt_pos] = True
+    seed_geom = np.full(len(pts_w), None, dtype=object)
+    seed_geom[pt_pos] = bgeoms[b_pos]
+    best_d = np.full(len(pts_w), np.nan)
+    best_d[pt_pos] = hit_d
+
+    # Require it to intersect corridor (avoid snapping behind blocks); None -> False
+    ok = shapely.intersects(seed_geom, corridor)
+
+    seeds = gpd.GeoDataFrame(
+        {"pt_id": pts_w["pt_id"].to_numpy()[ok], "best_d": best_d[ok]},
+        geometry=seed_geom[ok],
+        crs=work_crs,
+    )
+
+    reasons = np.where(
+        has_seed,
+        [f"nearest_not_in_corridor (d={d:.1f}m)" for d in best_d],
+        "no_building_within_max_seed_dist",
+    )
+    failed = gpd.GeoDataFrame(
+        {"pt_id": pts_w["pt_id"].to_numpy()[~ok], "reason": reasons[~ok]},
+        geometry=pts_w.geometry.to_numpy()[~ok],
+        crs=work_crs,
+    )
 
     print(f"[debug] seeds found: {len(seeds)} / {len(pts_w)} points")
     if len(failed) > 0:
         print("[debug] failed point ids:", failed["pt_id"].tolist())
         print(failed[["pt_id", "reason"]])
 
-    # Write debug layers (ArcMap)
-    seeds.to_crs(buildings.crs).to_file(out_gpkg, layer="sv1_seeds_debug", driver="GPKG")
-    failed.to_crs(buildings.crs).to_file(out_gpkg, layer="sv1_failed_points_debug", driver="GPKG")
-    print("Wrote debug layers: sv1_seeds_debug, sv1_failed_points_debug")
+    # Write debug layers (ArcMap), only when asked for: EP_DEBUG=1
+    if DEBUG:
+        write_gpkg_layer(seeds.to_crs(buildings.crs), out_gpkg, "sv1_seeds_debug", spatial_index=False)
+        write_gpkg_layer(failed.to_crs(buildings.crs), out_gpkg, "sv1_failed_points_debug", spatial_index=False)
+        print("Wrote debug layers: sv1_seeds_debug, sv1_failed_points_debug")
 
     if seeds.empty:
         raise ValueError("No seed buildings. Increase frontage_dist or max_seed_dist, or OSM buildings missing here.")
 
     # ---- Grow selection to catch adjacent frontage buildings ----
     grow_m = 18
-    seed_union = unary_union(seeds.geometry).buffer(grow_m)
-    grown = cand[cand.intersects(seed_union)].copy()
+    seeds_union = shapely.unary_union(seeds.geometry.to_numpy())
+    seed_union = seeds_union.buffer(grow_m)
+    # small frames: one batched GEOS predicate over the geometry array, no pandas alignment
+    grown = cand.iloc[shapely.intersects(cand.geometry.to_numpy(), seed_union)].copy()
     print(f"[debug] grown buildings: {len(grown)}")
 
     # ---- Determine correct side using seed centroid ----
@@ -172,11 +201,12 @@ def main() -> None:
         side_poly = two_sides
     else:
         polys = list(getattr(two_sides, "geoms", []))
-        seed_centroid = unary_union(seeds.geometry).centroid
-        dists = [seed_centroid.distance(p) for p in polys]
-        side_poly = polys[int(pd.Series(dists).idxmin())]
+        seed_centroid = seeds_union.centroid
+        dists = shapely.distance(polys, seed_centroid)
+        side_poly = polys[int(np.argmin(dists))]
 
-    grown = grown[grown.intersects(side_poly)].copy()
+    # a few dozen rows: a batched predicate is cheaper than building an sindex for them
+    grown = grown.iloc[shapely.intersects(grown.geometry.to_numpy(), side_poly)].copy()
 
     # ---- Filled polygon from buildings ----
     fill_m = 14.0
@@ -194,7 +224,6 @@ def main() -> None:
     poly = unary_union([poly_buildings, strip]).buffer(0)
 
     # clip to Bucharest boundary
-    bnd = unary_union(boundary_w.geometry)
     poly = poly.intersection(bnd).buffer(0)
     if poly.is_empty:
         raise ValueError("SV1 polygon became empty after clipping.")
@@ -220,7 +249,7 @@ def main() -> None:
         crs=work_crs,
     ).to_crs(buildings.crs)
 
-    out.to_file(out_gpkg, layer=out_layer, driver="GPKG")
+    write_gpkg_layer(out, out_gpkg, out_layer)
     print(f"Wrote layer '{out_layer}' into: {out_gpkg}")
 
 
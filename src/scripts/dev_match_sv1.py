@@ -2,15 +2,16 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from electoral_polygons.rules_parser import parse_sv
+from electoral_polygons.rules_parser import cached_parse_sv
 from electoral_polygons.match_addresses import match_sv_addresses
+from electoral_polygons.export import write_gpkg_layer
 
 
 def main() -> None:
     xlsx = "src/data/raw/RSV-17.11.2025-----Extras-partiale-BUC.xlsx"
     gpkg = "src/src/electoral_polygons/assets/bucharest_osm_assets.gpkg"
 
-    sv1 = parse_sv(xlsx_path=xlsx, judet="B", sv=1)
+    sv1 = cached_parse_sv(xlsx_path=xlsx, cache_dir=Path("src/data/scratch"), judet="B", sv=1)
 
     
 
@@ -33,7 +34,7 @@ def main() -> None:
     out_dir.mkdir(parents=True, exist_ok=True)
 
     out_path = out_dir / "sv1_addresses.gpkg"
-    matched.to_file(out_path, layer="sv1_addresses", driver="GPKG")
+    write_gpkg_layer(matched, out_path, "sv1_addresses", spatial_index=False)
 
     print(f"Wrote {out_path}")
 
@@ -3,7 +3,7 @@ from __future__ import annotations
 from pprint import pprint
 from pathlib import Path
 
-from electoral_polygons.rules_parser import parse_sv
+from electoral_polygons.rules_parser import cached_parse_sv
 
 
 def main() -> None:
@@ -11,7 +11,7 @@ def main() -> None:
     # Adjust if you run from elsewhere
     xlsx = "src/data/raw/RSV-17.11.2025-----Extras-partiale-BUC.xlsx"
 
-    sv1 = parse_sv(xlsx_path=xlsx, judet="B", sv=1)
+    sv1 = cached_parse_sv(xlsx_path=xlsx, cache_dir=Path("src/data/scratch"), judet="B", sv=1)
     pprint(sv1)
 
     # Optional: write a JSON debug artifact into scratch
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from electoral_polygons import _kernels
+from electoral_polygons._kernels import PARITY_EVEN, PARITY_NONE, PARITY_ODD
+
+KERNELS = [pytest.param(_kernels._spec_mask_numpy, id="numpy")]
+if _kernels.numba is not None:
+    KERNELS.append(pytest.param(_kernels._spec_mask_numba, id="numba"))
+
+
+def _row_ok_sets(lo, hi, parity_inf, ranges, singles, parity_code) -> bool:
+    # the set-based row_ok the kernels replaced
+    step = 2 if parity_inf != PARITY_NONE else 1
+    hn_set = set(range(lo, hi + 1, step))
+    if not hn_set:
+        return False
+    if parity_code == PARITY_ODD and (parity_inf == PARITY_EVEN or not any(n % 2 for n in hn_set)):
+        return False
+    if parity_code == PARITY_EVEN and (parity_inf == PARITY_ODD or all(n % 2 for n in hn_set)):
+        return False
+    if ranges and not any(a <= n <= b for a, b in ranges for n in hn_set):
+        return False
+    if singles and hn_set.isdisjoint(singles):
+        return False
+    return True
+
+
+def _random_intervals(rng, n):
+    lo = rng.integers(0, 40, n)
+    hi = lo + rng.integers(0, 12, n)
+    parity_inf = rng.choice([PARITY_NONE, PARITY_EVEN, PARITY_ODD], n)
+    # step-2 ranges have both endpoints of the inferred parity
+    stepped = parity_inf != PARITY_NONE
+    want_odd = parity_inf == PARITY_ODD
+    lo = np.where(stepped & ((lo % 2 == 1) != want_odd), lo + 1, lo)
+    hi = np.where(stepped & ((hi % 2 == 1) != want_odd), hi + 1, hi)
+    hi = np.maximum(hi, lo)
+    # missing housenumbers: the empty interval 0..-1
+    empty = rng.random(n) < 0.1
+    lo[empty], hi[empty], parity_inf[empty] = 0, -1, PARITY_NONE
+    return lo.astype(np.int64), hi.astype(np.int64), parity_inf.astype(np.int8)
+
+
+@pytest.mark.parametrize("kernel", KERNELS)
+def test_spec_mask_matches_set_semantics(kernel):
+    rng = np.random.default_rng(0)
+    lo, hi, parity_inf = _random_intervals(rng, 200)
+
+    for _ in range(300):
+        starts = rng.integers(0, 50, rng.integers(0, 4))
+        ranges = [(int(a), int(a + w)) for a, w in zip(starts, rng.integers(0, 10, len(starts)))]
+        singles = [int(x) for x in rng.integers(0, 55, rng.integers(0, 4))]
+        parity_code = int(rng.choice([PARITY_NONE, PARITY_EVEN, PARITY_ODD]))
+
+        ranges_arr = np.array(ranges, dtype=np.int64).reshape(-1, 2)
+        got = kernel(
+            lo,
+            hi,
+            parity_inf,
+            ranges_arr[:, 0].copy(),
+            ranges_arr[:, 1].copy(),
+            np.array(singles, dtype=np.int64),
+            parity_code,
+        )
+        want = [
+            _row_ok_sets(int(a), int(b), int(p), ranges, singles, parity_code)
+            for a, b, p in zip(lo, hi, parity_inf)
+        ]
+        assert got.tolist() == want, (ranges, singles, parity_code)
+
+
+@pytest.mark.parametrize("kernel", KERNELS)
+def test_spec_mask_empty_interval_never_matches(kernel):
+    lo, hi = np.array([0], dtype=np.int64), np.array([-1], dtype=np.int64)
+    none = np.array([], dtype=np.int64)
+    got = kernel(lo, hi, np.array([PARITY_NONE], dtype=np.int8), none, none, none, PARITY_NONE)
+    assert got.tolist() == [False]
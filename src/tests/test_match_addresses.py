@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import geopandas as gpd
+import pandas as pd
+from shapely.geometry import Point
+
+from electoral_polygons._kernels import PARITY_EVEN, PARITY_NONE, PARITY_ODD
+from electoral_polygons.match_addresses import dedupe_by_address, housenumber_info_series
+
+
+def _addresses(**cols) -> gpd.GeoDataFrame:
+    n = len(next(iter(cols.values())))
+    return gpd.GeoDataFrame(cols, geometry=[Point(i, 0) for i in range(n)], crs="EPSG:4326")
+
+
+def test_housenumber_info_series():
+    hns = pd.Series(["12", "75-79", "80 – 72", "109A", "109/1", "3-4", "1-2a", "bis", None, "1" * 20])
+    info = housenumber_info_series(hns)
+
+    na = pd.NA
+    assert info["lo"].tolist() == [12, 75, 72, 109, 109, 3, 1, na, na, na]
+    assert info["hi"].tolist() == [12, 79, 80, 109, 109, 4, 1, na, na, na]
+    assert info["parity_inferred"].tolist() == [
+        PARITY_NONE, PARITY_ODD, PARITY_EVEN, PARITY_NONE, PARITY_NONE, PARITY_NONE,
+        PARITY_NONE, PARITY_NONE, PARITY_NONE, PARITY_NONE,
+    ]
+    assert info["is_range"].tolist() == [False, True, True, False, False, True] + [False] * 4
+
+
+def test_dedupe_by_address_prefers_way_relation_node_other():
+    ids = ["other:1", "node:2", "relation:3", "way:4"]
+    for n in range(len(ids), 0, -1):
+        gdf = _addresses(
+            _street_norm=["calea victoriei"] * n,
+            addr_housenumber_int=[10] * n,
+            addr_id=ids[:n],
+        )
+        assert dedupe_by_address(gdf)["addr_id"].tolist() == [ids[n - 1]]
+
+
+def test_dedupe_by_address_groups_missing_keys_like_drop_duplicates():
+    gdf = _addresses(
+        _street_norm=[None, "mihalache", None, "mihalache", "mihalache", None],
+        addr_housenumber_int=pd.array([5, pd.NA, 5, pd.NA, 5, pd.NA], dtype="Int64"),
+        addr_id=["node:1", "node:2", "way:3", "way:4", "node:5", "node:6"],
+    )
+    out = dedupe_by_address(gdf)
+
+    # one row per (street, housenumber) group, missing values compared equal
+    ref = gdf.drop_duplicates(subset=["_street_norm", "addr_housenumber_int"])
+    assert len(out) == len(ref) == 4
+    assert sorted(out["addr_id"]) == ["node:5", "node:6", "way:3", "way:4"]
+
+
+def test_dedupe_by_address_adds_missing_housenumber_int():
+    gdf = _addresses(
+        _street_norm=["aviatorilor", "aviatorilor", "aviatorilor"],
+        addr_housenumber=["7A", "7", "9"],
+        addr_id=["node:1", "way:2", "node:3"],
+    )
+    before = gdf.copy()
+    out = dedupe_by_address(gdf)
+
+    assert out["addr_id"].tolist() == ["way:2", "node:3"]
+    assert out["addr_housenumber_int"].tolist() == [7, 9]
+    assert "addr_housenumber_int" not in gdf.columns
+    pd.testing.assert_frame_equal(gdf, before)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from electoral_polygons.rules_parser import parse_rule_cell, spec_ints
+
+
+def test_parse_rule_cell_ints():
+    specs = parse_rule_cell("numere impare nr. 21 -299 BIS# nr. 301 -319# nr. 319 B#")
+
+    assert [s["ranges_int"] for s in specs] == [[(21, 299)], [(301, 319)], []]
+    assert [s["singles_int"] for s in specs] == [[], [], [319]]
+    # the string forms keep their suffix
+    assert specs[2]["singles"] == ["319 B"]
+
+
+def test_parse_rule_cell_integral_has_no_ints():
+    assert parse_rule_cell("integral#") == [{"kind": "integral"}]
+
+
+def test_spec_ints_uses_precomputed():
+    spec = parse_rule_cell("numere pare nr. 64 -72#")[0]
+    assert spec_ints(spec) == ([(64, 72)], [])
+
+
+def test_spec_ints_derives_missing_keys():
+    # e.g. a JSON dump written before ranges_int / singles_int existed
+    spec = {"kind": "numbers", "parity": "odd", "ranges": [["1", "5"], ["21", "299 BIS"]], "singles": ["7 A"]}
+    assert spec_ints(spec) == ([(1, 5), (21, 299)], [7])
+
+
+def test_spec_ints_skips_tokens_without_number():
+    spec = {"kind": "numbers", "parity": "odd", "ranges": [["1", "9"], ["BIS", "5"]], "singles": ["BIS", "3"]}
+    assert spec_ints(spec) == ([(1, 9)], [3])